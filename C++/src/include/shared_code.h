@@ -3,6 +3,7 @@
 
 #include <sys/mman.h>    // shm_open, mmap, munmap
 #include <sys/stat.h>    // mode constants
+#include <sys/file.h>    // flock
 #include <fcntl.h>       // O_* constants
 #include <unistd.h>      // ftruncate, close
 #include <string>
@@ -72,6 +73,21 @@ inline bool destroy_memory_block(const char* filename) {
     return shm_unlink(filename) != -1;
 }
 
+// Take the exclusive writer lock on a shared memory block. The lock lives as long
+// as the returned descriptor stays open; Python writers try the same flock and
+// refuse to publish while it is held (TradingDataBridge.claim_writer).
+inline int claim_writer_lock(const char* filename) {
+    int lock_fd = shm_open(filename, O_RDWR, 0);
+    if (lock_fd == -1) {
+        throw std::runtime_error("Failed to open shared memory for locking");
+    }
+    if (flock(lock_fd, LOCK_EX | LOCK_NB) == -1) {
+        close(lock_fd);
+        throw std::runtime_error("Shared memory already has a writer");
+    }
+    return lock_fd;
+}
+
 
 template<typename T>
 class SharedMemory {
@@ -2,7 +2,12 @@
 #define TRADING_SYSTEM_H
 
 #include <atomic>
+#include <climits>
+#include <cstddef>
 #include <cstdint>
+#include <linux/futex.h>
+#include <sys/syscall.h>
+#include <unistd.h>
 
 // Essential trading data structure for shared memory communication
 struct TradingData {
@@ -12,4 +17,56 @@ struct TradingData {
     std::atomic<bool> valid{false};
 };
 
-#endif // TRADING_SYSTEM_H
\ No newline at end of file
+// Number of ticks kept in the shared memory ring
+constexpr uint32_t TICK_RING_CAPACITY = 1024;
+
+// Header and slots live on separate cache lines, so the producer's header
+// stores on every publish don't invalidate the line readers copy slots from
+constexpr size_t CACHE_LINE_SIZE = 64;
+
+// Ring entry guarded by a seqlock: seq is odd while the record is being
+// written and becomes 2 * (index + 1) once record `index` is complete
+struct TickSlot {
+    std::atomic<uint64_t> seq{0};
+    TradingData data;
+};
+
+// Single-producer ring of recent ticks. Readers keep their own cursor,
+// so the producer never blocks; a reader that falls more than
+// `capacity` records behind skips ahead to the oldest record still held.
+// Readers sleep in FUTEX_WAIT on `notify`, which changes on every publish.
+struct TickRing {
+    std::atomic<uint64_t> write_idx{0};   // records published so far
+    uint32_t capacity{TICK_RING_CAPACITY};
+    std::atomic<uint32_t> notify{0};      // futex word
+    uint32_t slot_size{sizeof(TickSlot)}; // checked by readers against their own layout
+    alignas(CACHE_LINE_SIZE) TickSlot slots[TICK_RING_CAPACITY];
+
+    void publish(double price, uint64_t timestamp, int32_t volume, bool valid) {
+        const uint64_t idx = write_idx.load(std::memory_order_relaxed);
+        TickSlot& slot = slots[idx % TICK_RING_CAPACITY];
+
+        slot.seq.store(2 * idx + 1, std::memory_order_relaxed);
+        std::atomic_thread_fence(std::memory_order_release);
+
+        slot.data.price.store(price, std::memory_order_relaxed);
+        slot.data.timestamp.store(timestamp, std::memory_order_relaxed);
+        slot.data.volume.store(volume, std::memory_order_relaxed);
+        slot.data.valid.store(valid, std::memory_order_relaxed);
+
+        slot.seq.store(2 * idx + 2, std::memory_order_release);
+        write_idx.store(idx + 1, std::memory_order_release);
+
+        // Shared (not FUTEX_PRIVATE) wake: waiters live in other processes
+        notify.fetch_add(1, std::memory_order_release);
+        syscall(SYS_futex, reinterpret_cast<uint32_t*>(&notify), FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+    }
+};
+
+// Layout is mirrored by TradingDataBridge in Python/data_bridge.py
+static_assert(sizeof(TradingData) == 24, "TradingData layout changed");
+static_assert(sizeof(TickSlot) == 32, "TickSlot layout changed");
+static_assert(sizeof(std::atomic<uint32_t>) == sizeof(uint32_t), "futex word must be a plain uint32_t");
+static_assert(offsetof(TickRing, slots) == CACHE_LINE_SIZE, "TickRing header layout changed");
+
+#endif // TRADING_SYSTEM_H
@@ -54,8 +54,10 @@ int main(int argc, char** argv) {
     try {
         cleanup_shared_memory();
         
-        SharedMemory<TradingData> trading_shm("/trading_data", true);        
-        auto shared_data = trading_shm.get();
+        SharedMemory<TickRing> trading_shm("/trading_data", true);
+        auto tick_ring = trading_shm.get();
+        // The ring allows a single writer; held until exit, before Python can attach
+        int writer_lock_fd = claim_writer_lock("/trading_data");
         
         python_pid = launch_python_process();
         if (python_pid == -1) {
@@ -85,10 +87,7 @@ int main(int argc, char** argv) {
             auto timestamp = std::chrono::duration_cast<std::chrono::seconds>(
                 std::chrono::system_clock::now().time_since_epoch()).count();
             
-            shared_data->price.store(current_price);
-            shared_data->volume.store(current_volume);
-            shared_data->timestamp.store(timestamp);
-            shared_data->valid.store(true);
+            tick_ring->publish(current_price, timestamp, current_volume, true);
             
             if (tick % 10 == 0) {
                 std::cout << "Tick " << tick 
@@ -105,6 +104,7 @@ int main(int argc, char** argv) {
             tick++;
         }
         
+        close(writer_lock_fd);
     } catch (const std::exception& e) {
         std::cerr << "Error: " << e.what() << std::endl;
         return 1;
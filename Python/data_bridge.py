@@ -4,201 +4,920 @@ Data Bridge - Python interface for C++ trading system
 Handles shared memory communication and provides API for data access
 """
 import mmap
-import struct
+import asyncio
+import ctypes
+import fcntl
 import os
+import struct
+import platform
+import signal
+import sys
+import csv
 import json
+import numpy as np
 import pandas as pd
 import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any, Tuple, Union
 import requests
 import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow  # noqa: F401  (enables the multi-threaded Arrow CSV reader)
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Rows per Parquet row group; bounds how much is decoded for tail reads
+PARQUET_ROW_GROUP_SIZE = 10_000
+
+# Column types of the market data CSVs; typed columns skip dtype inference
+CSV_SCHEMA = {
+    'timestamp': 'int64',
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+    'volume': 'float64',
+    'price': 'float64',
+}
+
+# Bytes read from the end of a CSV to find its last record
+CSV_TAIL_BYTES = 64 * 1024
+
+# futex(2) syscall numbers; readers fall back to short sleeps elsewhere
+_SYS_FUTEX = {'x86_64': 202, 'aarch64': 98, 'i686': 240, 'armv7l': 240}.get(platform.machine())
+_FUTEX_WAIT = 0
+_FUTEX_WAKE = 1
+# Sleep used between checks when futex is unavailable
+POLL_INTERVAL = 0.01
+# sched_yield is POSIX-only; sleep(0) is the closest equivalent elsewhere
+_sched_yield = getattr(os, 'sched_yield', lambda: time.sleep(0))
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+_libc = ctypes.CDLL(None, use_errno=True) if _SYS_FUTEX is not None else None
+
+def _futex_wait(address: int, expected: int, timeout: Optional[float] = None):
+    """Sleep while the u32 at `address` equals `expected`; returns on wake, timeout or change"""
+    if _libc is None:
+        time.sleep(POLL_INTERVAL if timeout is None else min(timeout, POLL_INTERVAL))
+        return
+    
+    ts = None
+    if timeout is not None:
+        timeout = max(timeout, 0.0)
+        ts = ctypes.byref(_Timespec(int(timeout), int((timeout % 1) * 1e9)))
+    _libc.syscall(_SYS_FUTEX, ctypes.c_void_p(address), _FUTEX_WAIT,
+                  ctypes.c_uint32(expected), ts, None, 0)
+
+def _futex_wake(address: int):
+    """Wake every process waiting on the u32 at `address`"""
+    if _libc is not None:
+        _libc.syscall(_SYS_FUTEX, ctypes.c_void_p(address), _FUTEX_WAKE, 0x7fffffff, None, None, 0)
+
+@lru_cache(maxsize=32)
+def _read_symbol_file(file_path: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    """Parse a data file. mtime/size are part of the cache key, so any append invalidates the entry."""
+    if file_path.endswith('.parquet'):
+        return pd.read_parquet(file_path)
+    try:
+        return pd.read_csv(file_path, engine=CSV_ENGINE, dtype=CSV_SCHEMA)
+    except ValueError:
+        # Blank or malformed cells don't fit the schema; infer dtypes so the file still loads
+        return pd.read_csv(file_path, engine=CSV_ENGINE)
+
+# (directory, extension) -> (directory mtime, symbols found)
+_symbol_dir_cache: Dict[Tuple[str, str], Tuple[int, List[str]]] = {}
+
+def list_symbols(asset_dir: str, file_ext: str = '.csv') -> List[str]:
+    """Symbols with a data file in asset_dir. Rescans only when the directory mtime changes,
+    which happens whenever an entry is added, removed or renamed."""
+    try:
+        mtime_ns = os.stat(asset_dir).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    
+    cached = _symbol_dir_cache.get((asset_dir, file_ext))
+    if cached is not None and cached[0] == mtime_ns:
+        return list(cached[1])
+    
+    with os.scandir(asset_dir) as entries:
+        symbols = [entry.name[:-len(file_ext)] for entry in entries
+                   if entry.name.endswith(file_ext) and entry.is_file()]
+    _symbol_dir_cache[(asset_dir, file_ext)] = (mtime_ns, symbols)
+    return list(symbols)
+
+class TickRecord(ctypes.Structure):
+    """C++ TradingData, mapped in place over shared memory"""
+    _fields_ = [
+        ('price', ctypes.c_double),
+        ('timestamp', ctypes.c_uint64),
+        ('volume', ctypes.c_int32),
+        ('valid', ctypes.c_bool),
+        ('_pad', ctypes.c_char * 3),
+    ]
+
+class TickSlot(ctypes.Structure):
+    """C++ TickSlot: seqlock word followed by one record"""
+    _fields_ = [
+        ('seq', ctypes.c_uint64),
+        ('record', TickRecord),
+    ]
+
+class TickRingHeader(ctypes.Structure):
+    """Header of the C++ TickRing, padded to its own cache line"""
+    _fields_ = [
+        ('write_idx', ctypes.c_uint64),
+        ('capacity', ctypes.c_uint32),
+        ('notify', ctypes.c_uint32),
+        ('slot_size', ctypes.c_uint32),
+        ('_pad', ctypes.c_char * 44),
+    ]
+
+# The ctypes structures above are the only description of the layout on the Python side;
+# the Struct and NumPy views below are generated from them
+_STRUCT_CODES = {ctypes.c_double: 'd', ctypes.c_uint64: 'Q', ctypes.c_int32: 'i', ctypes.c_bool: '?'}
+_TICK_FIELDS = [(name, getattr(TickRecord, name).offset, ctype)
+                for name, ctype in TickRecord._fields_ if not name.startswith('_')]
+
+def _slot_format() -> str:
+    """struct format of a whole TickSlot, with the compiler's padding spelled out"""
+    fmt, pos = '<Q', TickSlot.record.offset
+    for _, offset, ctype in _TICK_FIELDS:
+        fmt += 'x' * (TickSlot.record.offset + offset - pos) + _STRUCT_CODES[ctype]
+        pos = TickSlot.record.offset + offset + ctypes.sizeof(ctype)
+    return fmt + f'{ctypes.sizeof(TickSlot) - pos}x'
+
+# Whole TickSlot (seq + record) and its seq word alone, for copying a slot out in one unpack
+_SLOT_STRUCT = struct.Struct(_slot_format())
+_SEQ_STRUCT = struct.Struct('<Q')
+
+# The same layout as NumPy dtypes, for viewing the whole ring as one structured array
+TICK_DTYPE = np.dtype({
+    'names': [name for name, _, _ in _TICK_FIELDS],
+    'formats': [np.dtype(ctype) for _, _, ctype in _TICK_FIELDS],
+    'offsets': [offset for _, offset, _ in _TICK_FIELDS],
+    'itemsize': ctypes.sizeof(TickRecord),
+})
+TICK_SLOT_DTYPE = np.dtype({
+    'names': ['seq', 'record'],
+    'formats': ['<u8', TICK_DTYPE],
+    'offsets': [TickSlot.seq.offset, TickSlot.record.offset],
+    'itemsize': ctypes.sizeof(TickSlot),
+})
+assert _SLOT_STRUCT.size == TICK_SLOT_DTYPE.itemsize == ctypes.sizeof(TickSlot)
+
+@dataclass(slots=True)
+class Tick:
+    """One record read from shared memory. Time conversions run only when a caller asks for them."""
+    price: float
+    timestamp: int
+    volume: int
+    valid: bool
+    _formatted_time: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def datetime(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.timestamp) if self.timestamp > 0 else None
+    
+    @property
+    def formatted_time(self) -> str:
+        # Cached by hand: cached_property needs an instance __dict__, which slots removes
+        if self._formatted_time is None:
+            self._formatted_time = (datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+                                    if self.timestamp > 0 else "N/A")
+        return self._formatted_time
+    
+    def update(self, price: float, timestamp: int, volume: int, valid: bool):
+        """Overwrite this tick in place, for readers that reuse one Tick instead of allocating"""
+        self.price = price
+        self.timestamp = timestamp
+        self.volume = volume
+        self.valid = valid
+        self._formatted_time = None
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'price': self.price,
+            'timestamp': self.timestamp,
+            'volume': self.volume,
+            'valid': self.valid,
+            'datetime': self.datetime,
+            'formatted_time': self.formatted_time
+        }
 
 class TradingDataBridge:
+    """Python side of the C++ TickRing (see C++/src/include/trading_system.h).
+    
+    Layout: a 64-byte header (u64 write_idx, u32 capacity, u32 notify, u32 slot_size) followed by
+    `capacity` slots of a u64 seqlock word and one TradingData record. Slot seq is odd
+    while a record is being written and 2 * (index + 1) once record `index` is complete.
+    Only one process may write at a time: writers take an exclusive flock on the segment
+    (claim_writer), which the C++ producer holds while it runs. Every publish bumps
+    `notify` and wakes futex waiters on it, which is what wait_for_update blocks on.
+    
+    The header and slots are ctypes structures laid directly over the mmap. Readers
+    copy a whole slot out with one cached Struct.unpack_from and then re-check its seq.
+    """
+    # Fixed attribute set: the read and wait loops look these up on every call
+    __slots__ = (
+        'shm_name', 'shm_fd', 'shm_map', 'connected', 'capacity',
+        '_header', '_slots', '_ring', '_slots_offset', '_notify_addr', '_scratch',
+        '_read_idx', '_last_update_ns', '_waiters', '_waiters_cond',
+        '_writer', '_writer_refused',
+    )
+    
+    # Attempts to catch the latest record before giving up on a writer that keeps lapping us
+    READ_RETRIES = 3
+    # How long wait_for_update busy-polls before entering the kernel; a hot producer
+    # usually publishes within this window, saving the futex syscall and wakeup
+    SPIN_NS = 2_000
+    # While the producer has published within HOT_WINDOW_NS, the spin is followed by
+    # YIELD_ROUNDS sched_yield checks before sleeping, keeping a busy stream off the futex path
+    YIELD_ROUNDS = 64
+    HOT_WINDOW_NS = 5_000_000_000
+    
     def __init__(self, shm_name="/trading_data"):
         self.shm_name = shm_name
         self.shm_fd = None
         self.shm_map = None
+        self._header = None
+        self._slots = None
+        self._ring = None
+        self._slots_offset = ctypes.sizeof(TickRingHeader)
+        self._notify_addr = None
+        # Records are staged here and copied into their slot with a single memcpy
+        self._scratch = TickRecord()
+        self.capacity = 0
+        self._read_idx = 0
+        self._last_update_ns = 0
+        # Threads inside wait_for_update; close() waits for them to leave before unmapping
+        self._waiters = 0
+        self._waiters_cond = threading.Condition()
+        # Whether this bridge holds the writer lock, and whether a refusal was already reported
+        self._writer = False
+        self._writer_refused = False
         self.connected = False
         
     def connect(self) -> bool:
         """Connect to C++ shared memory"""
         try:
             self.shm_fd = os.open(f"/dev/shm{self.shm_name}", os.O_RDWR)
-            self.shm_map = mmap.mmap(self.shm_fd, 24, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+            size = os.fstat(self.shm_fd).st_size
+            # MAP_POPULATE (Linux) maps every page up front, so the first reads don't take page faults
+            self.shm_map = mmap.mmap(self.shm_fd, size, mmap.MAP_SHARED | getattr(mmap, 'MAP_POPULATE', 0),
+                                     mmap.PROT_READ | mmap.PROT_WRITE)
+            
+            self._header = TickRingHeader.from_buffer(self.shm_map)
+            self.capacity = self._header.capacity
+            # The producer records its slot size, so a layout change on either side fails here
+            # instead of being read as garbage
+            if self._header.slot_size != ctypes.sizeof(TickSlot):
+                raise ValueError(f"producer uses {self._header.slot_size}-byte slots, "
+                                 f"expected {ctypes.sizeof(TickSlot)}")
+            if self.capacity == 0 or size < ctypes.sizeof(TickRingHeader) + self.capacity * ctypes.sizeof(TickSlot):
+                raise ValueError(f"unexpected ring layout ({size} bytes, capacity {self.capacity})")
+            
+            # Slots are read at random, so skip readahead; WILLNEED covers platforms without
+            # MAP_POPULATE, and locking (where RLIMIT_MEMLOCK allows) keeps swap-ins out of the read path
+            if hasattr(mmap, 'MADV_RANDOM'):
+                self.shm_map.madvise(mmap.MADV_RANDOM)
+                self.shm_map.madvise(mmap.MADV_WILLNEED)
+            if _libc is not None and _libc.mlock(ctypes.c_void_p(ctypes.addressof(self._header)),
+                                                 ctypes.c_size_t(size)) != 0:
+                print(f"Shared memory not locked in RAM: {os.strerror(ctypes.get_errno())}")
+            
+            self._slots = (TickSlot * self.capacity).from_buffer(self.shm_map, self._slots_offset)
+            self._ring = np.frombuffer(self.shm_map, dtype=TICK_SLOT_DTYPE, count=self.capacity,
+                                       offset=self._slots_offset)
+            self._notify_addr = ctypes.addressof(self._header) + TickRingHeader.notify.offset
+            self._read_idx = self._header.write_idx
             self.connected = True
             print("✓ Connected to C++ shared memory")
             return True
         except Exception as e:
             print(f"Failed to connect to shared memory: {e}")
+            self.close()
             return False
     
-    def read_data(self) -> Optional[Dict[str, Any]]:
-        """Read current trading data from shared memory"""
+    def _read_slot(self, idx: int, out: Optional[Tick] = None) -> Optional[Tick]:
+        """Seqlock read of record `idx` into a new Tick or `out`; None if it is mid-write or was overwritten"""
+        offset = self._slots_offset + (idx % self.capacity) * _SLOT_STRUCT.size
+        seq, price, timestamp, volume, valid = _SLOT_STRUCT.unpack_from(self.shm_map, offset)
+        committed = 2 * idx + 2
+        if seq != committed or _SEQ_STRUCT.unpack_from(self.shm_map, offset)[0] != committed:
+            return None
+        if out is None:
+            return Tick(price, timestamp, volume, valid)
+        out.update(price, timestamp, volume, valid)
+        return out
+    
+    def _copy_records(self, start: int, stop: int) -> np.ndarray:
+        """Vectorized seqlock read of records start..stop-1 as a TICK_DTYPE array.
+        
+        Records that were mid-write or overwritten during the copy are left out.
+        """
+        idx = np.arange(start, stop, dtype=np.uint64)
+        positions = idx % self.capacity
+        slots = self._ring[positions]
+        committed = 2 * idx + 2
+        intact = (slots['seq'] == committed) & (self._ring['seq'][positions] == committed)
+        return slots['record'][intact]
+    
+    def read_recent(self, count: int) -> np.ndarray:
+        """Copy of the latest `count` records (at most the ring capacity) as a TICK_DTYPE array, oldest first"""
+        if not self.connected:
+            return np.empty(0, dtype=TICK_DTYPE)
+        
+        write_idx = self._header.write_idx
+        return self._copy_records(max(0, write_idx - min(count, self.capacity)), write_idx)
+    
+    def read_data(self, out: Optional[Tick] = None) -> Optional[Tick]:
+        """Read the most recently published record from shared memory.
+        
+        If `out` is given it is overwritten and returned instead of allocating a new Tick,
+        so a polling loop can reuse one object; its previous values are lost on every call.
+        """
         if not self.connected:
             return None
         
+        # connect() checked the mapping covers every slot, so these reads cannot fail
+        for _ in range(self.READ_RETRIES):
+            write_idx = self._header.write_idx
+            if write_idx == 0:
+                return None
+            tick = self._read_slot(write_idx - 1, out)
+            if tick is not None:
+                return tick
+        return None
+    
+    def read_batch(self) -> List[Tick]:
+        """Read every record published since the previous call (or since connect).
+        
+        If the writer has lapped this reader, records older than the ring capacity are skipped.
+        """
+        if not self.connected:
+            return []
+        
+        write_idx = self._header.write_idx
+        start = max(self._read_idx, write_idx - self.capacity)
+        ticks = []
+        for idx in range(start, write_idx):
+            tick = self._read_slot(idx)
+            if tick is not None:
+                ticks.append(tick)
+        
+        self._read_idx = write_idx
+        return ticks
+    
+    def read_batch_array(self) -> np.ndarray:
+        """read_batch as one TICK_DTYPE array: every pending record is copied and
+        seqlock-checked in a single vectorized pass, with no per-record Python objects.
+        Shares its position with read_batch.
+        """
+        if not self.connected:
+            return np.empty(0, dtype=TICK_DTYPE)
+        
+        write_idx = self._header.write_idx
+        records = self._copy_records(max(self._read_idx, write_idx - self.capacity), write_idx)
+        self._read_idx = write_idx
+        return records
+    
+    def wait_for_update(self, timeout: Optional[float] = None) -> bool:
+        """Block until read_batch has new records, the timeout expires or wake() is called.
+        
+        Returns True if new records are available. May return False early, so call it in a loop.
+        """
+        if not self._enter_wait():
+            time.sleep(POLL_INTERVAL if timeout is None else timeout)
+            return False
         try:
-            self.shm_map.seek(0)
-            data = self.shm_map.read(24)
-            price, timestamp, volume, valid = struct.unpack('dQi?3x', data)
-            
-            return {
-                'price': price,
-                'timestamp': timestamp,
-                'volume': volume,
-                'valid': bool(valid),
-                'datetime': datetime.fromtimestamp(timestamp) if timestamp > 0 else None,
-                'formatted_time': datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S") if timestamp > 0 else "N/A"
-            }
-        except Exception as e:
-            print(f"Error reading shared memory: {e}")
-            return None
+            return self._wait_for_update(timeout)
+        finally:
+            self._leave_wait()
+    
+    def _enter_wait(self) -> bool:
+        """Register a thread that blocks while using the mapping; False if not connected"""
+        with self._waiters_cond:
+            if not self.connected:
+                return False
+            self._waiters += 1
+            return True
+    
+    def _leave_wait(self):
+        with self._waiters_cond:
+            self._waiters -= 1
+            self._waiters_cond.notify_all()
+    
+    def _wait_for_update(self, timeout: Optional[float]) -> bool:
+        header = self._header
+        read_idx = self._read_idx
+        now = time.perf_counter_ns()
+        deadline = now + self.SPIN_NS
+        while True:
+            # Read the futex word before checking, so a publish in between makes the wait return at once
+            notify = header.notify
+            if header.write_idx != read_idx:
+                self._last_update_ns = time.perf_counter_ns()
+                return True
+            if time.perf_counter_ns() >= deadline:
+                break
+        
+        if now - self._last_update_ns < self.HOT_WINDOW_NS:
+            for _ in range(self.YIELD_ROUNDS):
+                _sched_yield()
+                notify = header.notify
+                if header.write_idx != read_idx:
+                    self._last_update_ns = time.perf_counter_ns()
+                    return True
+        
+        _futex_wait(self._notify_addr, notify, timeout)
+        if header.write_idx != read_idx:
+            self._last_update_ns = time.perf_counter_ns()
+            return True
+        return False
+    
+    def wake(self):
+        """Release every thread blocked in wait_for_update (e.g. on shutdown)"""
+        if self.connected:
+            _futex_wake(self._notify_addr)
+    
+    async def updates(self) -> AsyncIterator[Tick]:
+        """Yield every record published from now on, for use with `async for`.
+        
+        A helper thread sleeps on the futex word and wakes the event loop through
+        call_soon_threadsafe, so the loop never blocks and can serve many bridges.
+        Shares its position with read_batch.
+        """
+        if not self.connected:
+            return
+        
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        stop = threading.Event()
+        
+        def notify_loop():
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # event loop already closed
+        
+        def watch_notify(seen: int):
+            try:
+                self._watch_notify(seen, stop, notify_loop)
+            finally:
+                # The helper has returned, so no ctypes view of the mapping is left for close() to trip over
+                self._leave_wait()
+                # Ends the generator's wait when the bridge is closed
+                notify_loop()
+        
+        # Registered as a waiter on the watcher's behalf, so close() cannot unmap the header until it leaves
+        if not self._enter_wait():
+            return
+        try:
+            # Read before the first drain, so a publish during it is still seen as a change
+            seen = self._header.notify
+            watcher = threading.Thread(target=watch_notify, args=(seen,), daemon=True, name='tick-notify')
+            watcher.start()
+        except BaseException:
+            self._leave_wait()
+            raise
+        try:
+            while self.connected:
+                # Cleared before draining, so a publish during the drain still ends the next wait
+                ready.clear()
+                for tick in self.read_batch():
+                    yield tick
+                if not self.connected:
+                    break
+                await ready.wait()
+        finally:
+            stop.set()
+            self.wake()
+    
+    def _watch_notify(self, seen: int, stop: threading.Event, notify: Callable[[], None]):
+        header = self._header
+        notify_addr = self._notify_addr
+        while not stop.is_set() and self.connected:
+            _futex_wait(notify_addr, seen, 1.0)
+            current = header.notify
+            if current != seen:
+                seen = current
+                notify()
+    
+    def claim_writer(self) -> bool:
+        """Take the ring's single-writer lock; False while another process (e.g. the C++ producer) holds it.
+        
+        The lock is released when the bridge is closed or the process exits.
+        """
+        if self._writer:
+            return True
+        if not self.connected:
+            return False
+        try:
+            fcntl.flock(self.shm_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            if not self._writer_refused:
+                print("Shared memory already has a writer; not publishing from this process")
+                self._writer_refused = True
+            return False
+        self._writer = True
+        return True
     
     def write_data(self, price: float, volume: int, timestamp: int = None, valid: bool = True) -> bool:
-        """Write trading data to shared memory"""
+        """Publish a trading record into the next ring slot"""
+        if timestamp is None:
+            timestamp = int(time.time())
+        return self.write_batch([(price, volume, timestamp, valid)])
+    
+    def write_batch(self, records: List[Tuple[float, int, int, bool]]) -> bool:
+        """Publish (price, volume, timestamp, valid) records into consecutive ring slots.
+        
+        Waiters are woken once for the whole batch rather than once per record.
+        Returns False without writing if another process holds the writer lock.
+        """
         if not self.connected:
             return False
+        if not records:
+            return True
+        if not self.claim_writer():
+            return False
         
         try:
-            if timestamp is None:
-                timestamp = int(time.time())
+            scratch = self._scratch
+            slots = self._slots
+            capacity = self.capacity
+            idx = self._header.write_idx
             
-            data = struct.pack('dQi?3x', price, timestamp, volume, valid)
-            self.shm_map.seek(0)
-            self.shm_map.write(data)
-            self.shm_map.flush()
+            # /dev/shm is tmpfs, so there is nothing to msync; the even seq published
+            # after the copy is what tells readers a record is complete
+            for price, volume, timestamp, valid in records:
+                scratch.price = price
+                scratch.timestamp = timestamp
+                scratch.volume = volume
+                scratch.valid = valid
+                
+                slot = slots[idx % capacity]
+                slot.seq = 2 * idx + 1
+                slot.record = scratch
+                slot.seq = 2 * idx + 2
+                idx += 1
+            
+            self._header.write_idx = idx
+            self._header.notify = (self._header.notify + 1) & 0xffffffff
+            _futex_wake(self._notify_addr)
             return True
         except Exception as e:
             print(f"Error writing to shared memory: {e}")
             return False
     
     def close(self):
-        """Close shared memory connection"""
+        """Close shared memory connection.
+        
+        Threads blocked in wait_for_update are woken and waited for, since they still use the mapping.
+        """
+        with self._waiters_cond:
+            self.connected = False
+            while self._waiters:
+                # Repeated, as a waiter may still be spinning and only reach the futex after a wake
+                _futex_wake(self._notify_addr)
+                self._waiters_cond.wait(0.01)
+        
+        # The mmap cannot be closed while ctypes structures or the NumPy view still export its buffer
+        self._header = None
+        self._slots = None
+        self._ring = None
         if self.shm_map:
             self.shm_map.close()
+            self.shm_map = None
         if self.shm_fd:
-            os.close(self.shm_fd)
+            os.close(self.shm_fd)  # also releases the writer lock
+            self.shm_fd = None
+        self._writer = False
         self.connected = False
 
+class SymbolBuffer:
+    """Reusable record buffer for one symbol file.
+    
+    Rows are copied into a preallocated NumPy structured array that doubles when full.
+    Draining keeps the array, so steady-state polling appends without allocating and a
+    flush converts one contiguous block instead of concatenating many small frames.
+    """
+    
+    def __init__(self, template: pd.DataFrame, capacity: int = 4096):
+        # Numeric columns keep their dtype; text and anything else is stored as objects
+        self.dtype = np.dtype([
+            (str(name), dtype if dtype.kind in 'biuf' else object)
+            for name, dtype in ((name, template[name].to_numpy().dtype) for name in template.columns)
+        ])
+        self.arr = np.empty(capacity, dtype=self.dtype)
+        self.n = 0
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def accepts(self, df: pd.DataFrame) -> bool:
+        """True if df has the same columns and its values fit the buffer's dtypes"""
+        if [str(name) for name in df.columns] != list(self.dtype.names):
+            return False
+        return all(
+            self.dtype[name] == object or np.can_cast(df[name].to_numpy().dtype, self.dtype[name], 'same_kind')
+            for name in self.dtype.names
+        )
+    
+    def append(self, df: pd.DataFrame):
+        needed = self.n + len(df)
+        if needed > len(self.arr):
+            capacity = len(self.arr)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty(capacity, dtype=self.dtype)
+            grown[:self.n] = self.arr[:self.n]
+            self.arr = grown
+        
+        for name in self.dtype.names:
+            self.arr[name][self.n:needed] = df[name].to_numpy()
+        self.n = needed
+    
+    def last(self) -> Dict[str, Any]:
+        row = self.arr[self.n - 1]
+        return {name: row[name] for name in self.dtype.names}
+    
+    def drain(self) -> pd.DataFrame:
+        """Buffered rows as a new DataFrame; the buffer is emptied but keeps its capacity"""
+        df = pd.DataFrame(self.arr[:self.n], copy=True)
+        self.n = 0
+        return df
+
 class DataManager:
-    def __init__(self, data_dir="./market_data"):
+    def __init__(self, data_dir="./market_data", flush_rows: int = 1000, storage: str = 'csv'):
+        if storage not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported storage format: {storage}")
+        
         self.data_dir = data_dir
+        self.storage = storage
+        self.file_ext = f".{storage}"
         self.bridge = TradingDataBridge()
         self.bridge.connect()
         
+        # Records waiting to be appended, keyed by file path; buffers are kept for reuse after flushing
+        self.flush_rows = flush_rows
+        self._pending: Dict[str, SymbolBuffer] = {}
+        self._pending_lock = threading.Lock()
+        self._csv_headers: Dict[str, List[str]] = {}
+        
     def get_available_symbols(self) -> Dict[str, List[str]]:
         """Get all available symbols organized by asset type"""
-        symbols = {'stocks': [], 'forex': [], 'crypto': []}
-        
-        for asset_type in symbols.keys():
+        symbols = {}
+        for asset_type in ['stocks', 'forex', 'crypto']:
             asset_dir = os.path.join(self.data_dir, asset_type)
-            if os.path.exists(asset_dir):
-                for file in os.listdir(asset_dir):
-                    if file.endswith('.csv'):
-                        symbols[asset_type].append(file[:-4])
+            symbols[asset_type] = list_symbols(asset_dir, self.file_ext)
+            
+            # Symbols saved but not flushed yet have no file on disk
+            with self._pending_lock:
+                for path in self._pending:
+                    symbol = os.path.basename(path)[:-len(self.file_ext)]
+                    if os.path.dirname(path) == asset_dir and symbol not in symbols[asset_type]:
+                        symbols[asset_type].append(symbol)
         
         return symbols
     
+    def _find_symbol_file(self, symbol: str, asset_type: str = None) -> Optional[str]:
+        """Locate the data file for a symbol, including files that only exist in the write buffer"""
+        for atype in ([asset_type] if asset_type else ['stocks', 'forex', 'crypto']):
+            file_path = os.path.join(self.data_dir, atype, f"{symbol}{self.file_ext}")
+            if file_path in self._pending or os.path.exists(file_path):
+                return file_path
+        return None
+    
     def load_symbol_data(self, symbol: str, asset_type: str = None) -> Optional[pd.DataFrame]:
-        """Load data for a specific symbol"""
-        if asset_type:
-            file_path = os.path.join(self.data_dir, asset_type, f"{symbol}.csv")
-            if os.path.exists(file_path):
-                return pd.read_csv(file_path)
+        """Load data for a specific symbol. The frame is cached and shared, copy it before mutating."""
+        file_path = self._find_symbol_file(symbol, asset_type)
+        if file_path is None:
+            return None
+        
+        self.flush(file_path)
+        st = os.stat(file_path)
+        return _read_symbol_file(file_path, st.st_mtime_ns, st.st_size)
+    
+    def _read_parquet_tail(self, file_path: str, limit: int) -> pd.DataFrame:
+        """Decode only the trailing row groups needed to cover the last `limit` rows"""
+        import pyarrow.parquet as pq
+        
+        parquet_file = pq.ParquetFile(file_path)
+        groups, rows = [], 0
+        for i in reversed(range(parquet_file.num_row_groups)):
+            groups.insert(0, i)
+            rows += parquet_file.metadata.row_group(i).num_rows
+            if rows >= limit:
+                break
+        
+        return parquet_file.read_row_groups(groups).to_pandas().tail(limit)
+    
+    def _tail_row(self, file_path: str) -> Optional[Dict[str, str]]:
+        """Parse the last record of an append-only CSV from its final CSV_TAIL_BYTES"""
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            size = os.fstat(fd).st_size
+            read_size = min(size, CSV_TAIL_BYTES)
+            lines = os.pread(fd, read_size, size - read_size).decode('utf-8', errors='replace').splitlines()
+        finally:
+            os.close(fd)
+        
+        if read_size == size:
+            # Whole file fits in the window: first line is the header
+            if not lines:
+                return None
+            self._csv_headers[file_path] = next(csv.reader([lines[0]]))
+            lines = lines[1:]
         else:
-            # Search all asset types
-            for atype in ['stocks', 'forex', 'crypto']:
-                file_path = os.path.join(self.data_dir, atype, f"{symbol}.csv")
-                if os.path.exists(file_path):
-                    return pd.read_csv(file_path)
+            # First line of the window may be cut mid-record
+            lines = lines[1:]
+        
+        lines = [line for line in lines if line.strip()]
+        if not lines:
+            return None
+        
+        header = self._csv_headers.get(file_path)
+        if header is None:
+            with open(file_path, newline='') as f:
+                header = self._csv_headers[file_path] = next(csv.reader(f))
         
+        return dict(zip(header, next(csv.reader([lines[-1]]))))
+    
+    def _latest_row(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Most recent record for a symbol, served from the write buffer when possible"""
+        file_path = self._find_symbol_file(symbol)
+        if file_path is None:
+            return None
+        
+        with self._pending_lock:
+            buffer = self._pending.get(file_path)
+            if buffer:
+                return buffer.last()
+        
+        if self.storage == 'csv':
+            return self._tail_row(file_path)
+        
+        df = self._read_parquet_tail(file_path, 1)
+        if not df.empty:
+            return df.iloc[-1].to_dict()
         return None
     
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """Get latest price for a symbol from local data"""
-        df = self.load_symbol_data(symbol)
-        if df is not None and 'price' in df.columns and not df.empty:
-            return float(df['price'].iloc[-1])
+        latest = self._latest_row(symbol)
+        if latest is not None and 'price' in latest:
+            return float(latest['price'])
         return None
     
     def get_price_history(self, symbol: str, limit: int = 100) -> Optional[pd.DataFrame]:
         """Get recent price history for a symbol"""
-        df = self.load_symbol_data(symbol)
+        if self.storage == 'parquet':
+            file_path = self._find_symbol_file(symbol)
+            if file_path is None:
+                return None
+            self.flush(file_path)
+            df = self._read_parquet_tail(file_path, limit)
+        else:
+            df = self.load_symbol_data(symbol)
+        
         if df is not None and not df.empty:
             return df.tail(limit)
         return None
     
     def update_shared_memory(self, symbol: str) -> bool:
         """Update shared memory with latest data for symbol"""
-        df = self.load_symbol_data(symbol)
-        if df is not None and not df.empty:
-            latest = df.iloc[-1]
-            return self.bridge.write_data(
-                price=float(latest['price']),
-                volume=int(latest['volume']),
-                timestamp=int(latest['timestamp']),
-                valid=True
-            )
-        return False
+        return self.update_shared_memory_batch([symbol]) == 1
     
-    def get_shared_memory_data(self) -> Optional[Dict[str, Any]]:
+    def update_shared_memory_batch(self, symbols: List[str]) -> int:
+        """Publish the latest record of every symbol in one ring write; returns how many were published"""
+        records = []
+        for symbol in symbols:
+            try:
+                latest = self._latest_row(symbol)
+                if latest is not None:
+                    records.append((
+                        float(latest['price']),
+                        int(float(latest['volume'])),
+                        int(float(latest['timestamp'])),
+                        True
+                    ))
+            except Exception as e:
+                print(f"Error reading latest {symbol} data: {e}")
+        
+        if records and self.bridge.write_batch(records):
+            return len(records)
+        return 0
+    
+    def get_shared_memory_data(self) -> Optional[Tick]:
         """Get current data from shared memory"""
         return self.bridge.read_data()
     
-    def save_new_data(self, symbol: str, data: List[Dict], asset_type: str = 'stocks'):
-        """Save new market data to CSV"""
-        if not data:
+    def save_new_data(self, symbol: str, data: Union[pd.DataFrame, List[Dict]], asset_type: str = 'stocks'):
+        """Queue new market data for the symbol's file; written once flush_rows records are buffered"""
+        if data is None or len(data) == 0:
             return
         
-        df = pd.DataFrame(data)
-        asset_dir = os.path.join(self.data_dir, asset_type)
-        os.makedirs(asset_dir, exist_ok=True)
+        df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(data)
+        file_path = os.path.join(self.data_dir, asset_type, f"{symbol}{self.file_ext}")
+        
+        buffer = self._pending.get(file_path)
+        if buffer is None or not buffer.accepts(df):
+            # Different columns or types: write what is buffered, then start a buffer for the new layout
+            self.flush(file_path)
+            buffer = SymbolBuffer(df)
         
-        file_path = os.path.join(asset_dir, f"{symbol}.csv")
+        with self._pending_lock:
+            buffer.append(df)
+            self._pending[file_path] = buffer
+            buffered = len(buffer)
+        
+        if buffered >= self.flush_rows:
+            self.flush(file_path)
+    
+    def flush(self, file_path: str = None):
+        """Append buffered records to disk (every buffered file when file_path is None)"""
+        with self._pending_lock:
+            paths = list(self._pending) if file_path is None else [file_path]
+            pending = {path: self._pending[path].drain() for path in paths
+                       if path in self._pending and len(self._pending[path])}
         
-        # Append to existing file or create new one
+        for path, df in pending.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            
+            if self.storage == 'parquet':
+                self._write_parquet(path, df)
+            else:
+                # Append to existing file or create new one
+                df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+            print(f"Saved {len(df)} records to {path}")
+    
+    def _write_parquet(self, file_path: str, df: pd.DataFrame):
+        """Rewrite a Parquet file with new rows appended (Parquet files cannot be appended in place)"""
         if os.path.exists(file_path):
-            df.to_csv(file_path, mode='a', header=False, index=False)
-        else:
-            df.to_csv(file_path, index=False)
+            df = pd.concat([pd.read_parquet(file_path), df], ignore_index=True)
         
-        print(f"Saved {len(data)} records for {symbol}")
+        # Write beside the target and swap so readers never see a partial file
+        tmp_path = f"{file_path}.tmp"
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', index=False,
+                      row_group_size=PARQUET_ROW_GROUP_SIZE)
+        os.replace(tmp_path, file_path)
+    
+    def close(self):
+        """Flush buffered records and release shared memory"""
+        self.flush()
+        self.bridge.close()
 
 class PythonAPIClient:
     """Python API client for fetching data (complementing C++ providers)"""
     
+    # Seconds to wait for an API response; a hung request would otherwise stall a monitor cycle forever
+    REQUEST_TIMEOUT = 10
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': 'TradingApp/1.0'})
+        # Fetches run concurrently on TradingSystem's pool and requests.Session is not
+        # thread-safe, so every thread gets its own session (and connection pool)
+        self._local = threading.local()
+    
+    @property
+    def session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update({'User-Agent': 'TradingApp/1.0'})
+        return session
     
-    def get_yahoo_data(self, symbol: str, days: int = 30) -> List[Dict]:
+    def get_yahoo_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
         """Fetch data from Yahoo Finance (Python implementation)"""
         try:
             import yfinance as yf
             ticker = yf.Ticker(symbol)
             hist = ticker.history(period=f"{days}d")
             
-            data = []
-            for date, row in hist.iterrows():
-                data.append({
-                    'timestamp': int(date.timestamp()),
-                    'symbol': symbol,
-                    'open': float(row['Open']),
-                    'high': float(row['High']),
-                    'low': float(row['Low']),
-                    'close': float(row['Close']),
-                    'volume': float(row['Volume']),
-                    'price': float(row['Close']),
-                    'source': 'YFinance-Python'
-                })
-            
-            return data
+            # Build the frame column-wise instead of boxing every cell via iterrows
+            close = hist['Close'].to_numpy(dtype=float)
+            return pd.DataFrame({
+                'timestamp': hist.index.as_unit('s').asi8,
+                'symbol': symbol,
+                'open': hist['Open'].to_numpy(dtype=float),
+                'high': hist['High'].to_numpy(dtype=float),
+                'low': hist['Low'].to_numpy(dtype=float),
+                'close': close,
+                'volume': hist['Volume'].to_numpy(dtype=float),
+                'price': close,
+                'source': 'YFinance-Python'
+            })
         except Exception as e:
             print(f"Error fetching Yahoo data: {e}")
-            return []
+            return pd.DataFrame()
     
-    def get_crypto_data(self, symbol: str, days: int = 30) -> List[Dict]:
+    def get_crypto_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
         """Fetch crypto data from free API"""
         try:
             # Using CoinGecko free API
@@ -206,40 +925,50 @@ class PythonAPIClient:
             url = f"https://api.coingecko.com/api/v3/coins/{crypto_id}/market_chart"
             params = {'vs_currency': 'usd', 'days': days}
             
-            response = self.session.get(url, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                prices = data.get('prices', [])
-                volumes = data.get('total_volumes', [])
-                
-                result = []
-                for i, (timestamp, price) in enumerate(prices):
-                    volume = volumes[i][1] if i < len(volumes) else 0
-                    result.append({
-                        'timestamp': int(timestamp / 1000),  # Convert to seconds
-                        'symbol': symbol,
-                        'open': price,  # Simplified - real OHLC would need different API
-                        'high': price,
-                        'low': price,
-                        'close': price,
-                        'volume': volume,
-                        'price': price,
-                        'source': 'CoinGecko-Python'
-                    })
-                
-                return result
+            response = self.session.get(url, params=params, timeout=self.REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                return pd.DataFrame()
+            
+            data = response.json()
+            # [[ms, value], ...] pairs decoded into (n, 2) arrays in one pass each
+            prices = np.asarray(data.get('prices', []), dtype=np.float64).reshape(-1, 2)
+            volumes = np.asarray(data.get('total_volumes', []), dtype=np.float64).reshape(-1, 2)
+            
+            # Ticks without a matching volume entry get 0
+            volume = np.zeros(len(prices))
+            n = min(len(prices), len(volumes))
+            volume[:n] = volumes[:n, 1]
+            
+            price = prices[:, 1]
+            return pd.DataFrame({
+                'timestamp': (prices[:, 0] // 1000).astype(np.int64),  # Convert to seconds
+                'symbol': symbol,
+                'open': price,  # Simplified - real OHLC would need different API
+                'high': price,
+                'low': price,
+                'close': price,
+                'volume': volume,
+                'price': price,
+                'source': 'CoinGecko-Python'
+            })
         except Exception as e:
             print(f"Error fetching crypto data: {e}")
-            return []
+            return pd.DataFrame()
 
 class TradingSystem:
     """Main Python trading system interface"""
     
+    # Symbols refreshed from the crypto API on every monitor cycle
+    CRYPTO_SYMBOLS = ('BTC', 'ETH', 'BTCUSD', 'ETHUSD')
+    # Concurrent API requests per monitor cycle
+    FETCH_WORKERS = 8
+    
     def __init__(self, data_dir="./market_data"):
         self.data_manager = DataManager(data_dir)
         self.api_client = PythonAPIClient()
         self.monitoring = False
         self.monitor_thread = None
+        self._stop_event = threading.Event()
     
     def start_monitoring(self, symbols: List[str], interval: int = 60):
         """Start monitoring symbols and updating shared memory"""
@@ -247,6 +976,7 @@ class TradingSystem:
             return
         
         self.monitoring = True
+        self._stop_event.clear()
         self.monitor_symbols = symbols
         self.monitor_interval = interval
         
@@ -257,29 +987,44 @@ class TradingSystem:
     def stop_monitoring(self):
         """Stop monitoring"""
         self.monitoring = False
+        self._stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join()
+        self.data_manager.flush()
         print("Stopped monitoring")
     
     def _monitor_loop(self):
         """Main monitoring loop"""
-        while self.monitoring:
-            for symbol in self.monitor_symbols:
-                try:
-                    # Update shared memory with latest local data
-                    self.data_manager.update_shared_memory(symbol)
-                    
-                    # Optionally fetch fresh data
-                    if symbol.upper() in ['BTC', 'ETH', 'BTCUSD', 'ETHUSD']:
-                        fresh_data = self.api_client.get_crypto_data(symbol, 1)
-                        if fresh_data:
+        with ThreadPoolExecutor(max_workers=self.FETCH_WORKERS, thread_name_prefix='fetch') as pool:
+            while self.monitoring:
+                # Start every API request up front so network latency overlaps across symbols
+                fetches = {
+                    symbol: pool.submit(self.api_client.get_crypto_data, symbol, 1)
+                    for symbol in self.monitor_symbols
+                    if symbol.upper() in self.CRYPTO_SYMBOLS
+                }
+                
+                # Update shared memory with the latest local data for every symbol at once
+                self.data_manager.update_shared_memory_batch(self.monitor_symbols)
+                
+                # Store fresh data as each request finishes
+                for symbol, fetch in fetches.items():
+                    try:
+                        fresh_data = fetch.result()
+                        if len(fresh_data) > 0:
                             self.data_manager.save_new_data(symbol, fresh_data, 'crypto')
-                    
-                    time.sleep(1)  # Small delay between symbols
+                    except Exception as e:
+                        print(f"Error monitoring {symbol}: {e}")
+                
+                # Write this cycle's records before sleeping, so a killed process loses at most
+                # the cycle in progress; flush_rows only batches writes within a cycle
+                try:
+                    self.data_manager.flush()
                 except Exception as e:
-                    print(f"Error monitoring {symbol}: {e}")
-            
-            time.sleep(self.monitor_interval)
+                    print(f"Error writing monitored data: {e}")
+                
+                # Returns as soon as stop_monitoring is called
+                self._stop_event.wait(self.monitor_interval)
     
     def fetch_and_store(self, symbol: str, days: int = 30, asset_type: str = 'stocks'):
         """Fetch data and store locally"""
@@ -288,19 +1033,21 @@ class TradingSystem:
         else:
             data = self.api_client.get_yahoo_data(symbol, days)
         
-        if data:
+        if data is not None and len(data) > 0:
             self.data_manager.save_new_data(symbol, data, asset_type)
+            self.data_manager.flush()
             return True
         return False
     
     def get_portfolio_summary(self) -> Dict[str, Any]:
         """Get summary of all available data"""
         symbols = self.data_manager.get_available_symbols()
+        shared_data = self.data_manager.get_shared_memory_data()
         summary = {
             'total_symbols': sum(len(symbols[key]) for key in symbols),
             'by_asset_type': {key: len(value) for key, value in symbols.items()},
             'symbols': symbols,
-            'shared_memory': self.data_manager.get_shared_memory_data()
+            'shared_memory': shared_data.as_dict() if shared_data else None
         }
         return summary
     
@@ -319,6 +1066,10 @@ class TradingSystem:
 # Example usage functions
 def main():
     """Example usage of the trading system"""
+    # The C++ launcher stops this process with SIGTERM; turn it into SystemExit so the
+    # finally block below still flushes buffered records
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    
     system = TradingSystem()
     
     # Get portfolio summary
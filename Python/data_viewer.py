@@ -6,13 +6,15 @@ import os
 import mmap
 import struct
 import threading
-import time
+import collections
 from datetime import datetime
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import matplotlib.ticker as mticker
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 
-from data_bridge import TradingDataBridge
+from data_bridge import DataManager, TradingDataBridge
 
 class DataViewer:
     def __init__(self, root):
@@ -21,10 +23,28 @@ class DataViewer:
         self.root.geometry("1200x800")
         
         self.current_data = None
+        self._search_source = None
+        self._search_columns = []
+        self._filter_job = None
+        
+        # Only the rows in view are inserted into the Treeview; see display_data
+        self._display_df = pd.DataFrame()
+        self._top_row = 0
+        self._visible_rows = 50
+        # Selected row as an index into _display_df, kept while it scrolls out of the rendered window
+        self._selected_row = None
+        
         self.shared_memory = TradingDataBridge()
         self.update_thread = None
         self.running = False
         
+        # Lines produced by the monitor thread, flushed to the UI by drain_log
+        self._log_queue = collections.deque()
+        self._drain_job = None
+        
+        # Reused across symbol selections; rebuilt only when the data directory changes
+        self.data_manager = None
+        
         self.setup_ui()
         self.setup_shared_memory()
         
@@ -83,20 +103,29 @@ class DataViewer:
         self.search_var = tk.StringVar()
         search_entry = ttk.Entry(file_frame, textvariable=self.search_var, width=20)
         search_entry.pack(side='left', padx=5)
-        search_entry.bind('<KeyRelease>', self.filter_data)
+        search_entry.bind('<KeyRelease>', self.schedule_filter)
         
         # Data table
         table_frame = ttk.Frame(parent)
         table_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Treeview with scrollbars
+        # Treeview with scrollbars; vertical scrolling moves a window over the DataFrame
         self.tree = ttk.Treeview(table_frame)
-        v_scroll = ttk.Scrollbar(table_frame, orient='vertical', command=self.tree.yview)
+        self.v_scroll = ttk.Scrollbar(table_frame, orient='vertical', command=self.on_table_scroll)
         h_scroll = ttk.Scrollbar(table_frame, orient='horizontal', command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        self.tree.configure(xscrollcommand=h_scroll.set)
+        
+        self.tree.bind('<Configure>', self.on_table_resize)
+        self.tree.bind('<MouseWheel>', self.on_table_wheel)
+        self.tree.bind('<Button-4>', self.on_table_wheel)
+        self.tree.bind('<Button-5>', self.on_table_wheel)
+        # Treeview's own key handling only knows the rendered rows and would scroll it out of step
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(key, self.on_table_key)
+        self.tree.bind('<<TreeviewSelect>>', self.on_table_select)
         
         self.tree.pack(side='left', fill='both', expand=True)
-        v_scroll.pack(side='right', fill='y')
+        self.v_scroll.pack(side='right', fill='y')
         h_scroll.pack(side='bottom', fill='x')
         
         # Stats frame
@@ -133,8 +162,12 @@ class DataViewer:
         ttk.Button(chart_control, text="Plot Volume", command=self.plot_volume).pack(side='left', padx=5)
         ttk.Button(chart_control, text="Clear Chart", command=self.clear_chart).pack(side='left', padx=5)
         
-        # Chart area
+        # Chart area; artists are created once and updated in place by the plot methods
         self.fig, self.ax = plt.subplots(figsize=(10, 6))
+        self.price_line, = self.ax.plot([], [])
+        self.price_line.set_visible(False)
+        self.volume_bars = None
+        self.ax.grid(True)
         self.canvas = FigureCanvasTkAgg(self.fig, parent)
         self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=5, pady=5)
     
@@ -151,18 +184,22 @@ class DataViewer:
             return
             
         symbols = []
-        for subdir in ['stocks', 'forex', 'crypto']:
-            subdir_path = os.path.join(data_dir, subdir)
-            if os.path.exists(subdir_path):
-                for file in os.listdir(subdir_path):
-                    if file.endswith('.csv'):
-                        symbols.append(file[:-4])  # Remove .csv extension
+        for asset_symbols in self.get_data_manager().get_available_symbols().values():
+            symbols.extend(asset_symbols)
         
         self.symbol_combo['values'] = sorted(symbols)
         if symbols:
             self.symbol_combo.set(symbols[0])
             self.load_symbol_data()
     
+    def get_data_manager(self):
+        data_dir = self.data_dir_var.get()
+        if self.data_manager is None or self.data_manager.data_dir != data_dir:
+            if self.data_manager is not None:
+                self.data_manager.close()
+            self.data_manager = DataManager(data_dir)
+        return self.data_manager
+    
     def browse_directory(self):
         directory = filedialog.askdirectory(initialdir=self.data_dir_var.get())
         if directory:
@@ -178,13 +215,11 @@ class DataViewer:
             self.load_csv_file(file_path)
     
     def load_symbol_data(self, event=None):
-        from data_bridge import DataManager
         symbol = self.symbol_var.get()
         if not symbol:
             return
             
-        data_manager = DataManager(self.data_dir_var.get())
-        df = data_manager.load_symbol_data(symbol)
+        df = self.get_data_manager().load_symbol_data(symbol)
         
         if df is not None:
             self.current_data = df
@@ -203,11 +238,12 @@ class DataViewer:
             messagebox.showerror("Error", f"Failed to load CSV: {e}")
     
     def display_data(self, df):
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self._display_df = df
+        self._top_row = 0
+        self._selected_row = None
         
         if df.empty:
+            self.render_rows()
             return
         
         # Set up columns
@@ -218,10 +254,91 @@ class DataViewer:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=100)
         
-        # Insert data
-        for index, row in df.iterrows():
-            values = [str(row[col]) for col in df.columns]
-            self.tree.insert('', 'end', values=values)
+        self.render_rows()
+    
+    def render_rows(self):
+        # Replace the Treeview contents with the rows currently in view
+        self.tree.delete(*self.tree.get_children())
+        
+        total = len(self._display_df)
+        bottom = min(self._top_row + self._visible_rows + 1, total)
+        window = self._display_df.iloc[self._top_row:bottom].astype(str)
+        for offset, values in enumerate(window.itertuples(index=False, name=None)):
+            self.tree.insert('', 'end', iid=str(self._top_row + offset), values=values)
+        
+        if self._selected_row is not None and self.tree.exists(str(self._selected_row)):
+            self.tree.selection_set(str(self._selected_row))
+            self.tree.focus(str(self._selected_row))
+        
+        if total:
+            self.v_scroll.set(self._top_row / total, bottom / total)
+        else:
+            self.v_scroll.set(0, 1)
+    
+    def scroll_table_to(self, top_row):
+        max_top = max(0, len(self._display_df) - self._visible_rows)
+        top_row = max(0, min(top_row, max_top))
+        if top_row != self._top_row:
+            self._top_row = top_row
+            self.render_rows()
+    
+    def on_table_scroll(self, action, amount, unit=None):
+        # Scrollbar callback: ('moveto', fraction) or ('scroll', n, 'units'|'pages')
+        if action == 'moveto':
+            self.scroll_table_to(int(float(amount) * len(self._display_df)))
+        elif action == 'scroll':
+            step = self._visible_rows if unit == 'pages' else 1
+            self.scroll_table_to(self._top_row + int(amount) * step)
+    
+    def on_table_wheel(self, event):
+        direction = -1 if event.num == 4 or event.delta > 0 else 1
+        self.scroll_table_to(self._top_row + direction * 3)
+        return 'break'
+    
+    def on_table_key(self, event):
+        total = len(self._display_df)
+        if not total:
+            return 'break'
+        
+        current = self._selected_row
+        if current is None:
+            # Nothing selected yet: Up/Down select the first row in view
+            current = self._top_row
+            step = 0
+        else:
+            step = 1
+        moves = {
+            'Up': current - step,
+            'Down': current + step,
+            'Prior': current - self._visible_rows,
+            'Next': current + self._visible_rows,
+            'Home': 0,
+            'End': total - 1,
+        }
+        target = max(0, min(moves[event.keysym], total - 1))
+        
+        # Scroll just far enough to keep the target row fully in view
+        if target < self._top_row:
+            self.scroll_table_to(target)
+        elif target >= self._top_row + self._visible_rows:
+            self.scroll_table_to(target - self._visible_rows + 1)
+        
+        self._selected_row = target
+        self.tree.selection_set(str(target))
+        self.tree.focus(str(target))
+        return 'break'
+    
+    def on_table_select(self, event):
+        selection = self.tree.selection()
+        if selection:
+            self._selected_row = int(selection[0])
+    
+    def on_table_resize(self, event):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        visible_rows = max(1, event.height // row_height)
+        if visible_rows != self._visible_rows:
+            self._visible_rows = visible_rows
+            self.render_rows()
     
     def update_stats(self, df):
         if df.empty:
@@ -244,7 +361,14 @@ class DataViewer:
         self.stats_text.delete(1.0, 'end')
         self.stats_text.insert('end', '\n'.join(stats))
     
+    def schedule_filter(self, event=None):
+        # Coalesce rapid typing into one filter pass
+        if self._filter_job is not None:
+            self.root.after_cancel(self._filter_job)
+        self._filter_job = self.root.after(150, self.filter_data)
+    
     def filter_data(self, event=None):
+        self._filter_job = None
         if self.current_data is None:
             return
         
@@ -253,13 +377,16 @@ class DataViewer:
             self.display_data(self.current_data)
             return
         
-        # Filter data based on search term
-        filtered_df = self.current_data[
-            self.current_data.astype(str).apply(
-                lambda x: x.str.lower().str.contains(search_term, na=False)
-            ).any(axis=1)
-        ]
-        self.display_data(filtered_df)
+        # Lowercased text of each column is built once per loaded frame, not per keystroke
+        if self._search_source is not self.current_data:
+            self._search_columns = [self.current_data[col].astype(str).str.lower()
+                                    for col in self.current_data.columns]
+            self._search_source = self.current_data
+        
+        mask = np.zeros(len(self.current_data), dtype=bool)
+        for column in self._search_columns:
+            mask |= column.str.contains(search_term, regex=False, na=False).to_numpy()
+        self.display_data(self.current_data[mask])
     
     def export_data(self):
         if self.current_data is None:
@@ -279,72 +406,110 @@ class DataViewer:
             self.running = True
             self.update_thread = threading.Thread(target=self.monitor_shared_memory, daemon=True)
             self.update_thread.start()
+            if self._drain_job is None:
+                self._drain_job = self.root.after(100, self.drain_log)
             self.start_button.config(state='disabled')
             self.stop_button.config(state='normal')
     
     def stop_monitoring(self):
         self.running = False
+        self.shared_memory.wake()
+        # The monitor thread must be gone before the bridge can be closed under it
+        if self.update_thread is not None:
+            self.update_thread.join()
+            self.update_thread = None
         self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
     
     def monitor_shared_memory(self):
         while self.running:
-            data = self.shared_memory.read_data()
-            if data:
-                timestamp = datetime.now().strftime("%H:%M:%S")
-                info = f"[{timestamp}] Price: ${data['price']:.2f}, Volume: {data['volume']:,}, "
-                info += f"Timestamp: {data['timestamp']}, Valid: {data['valid']}\n"
-                
-                self.root.after(0, lambda: self.realtime_text.insert('end', info))
-                self.root.after(0, lambda: self.realtime_text.see('end'))
+            # Blocks in the kernel until the producer publishes; timeout re-checks self.running
+            if not self.shared_memory.wait_for_update(timeout=1.0):
+                continue
             
-            time.sleep(1)
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            for data in self.shared_memory.read_batch():
+                info = f"[{timestamp}] Price: ${data.price:.2f}, Volume: {data.volume:,}, "
+                info += f"Timestamp: {data.timestamp}, Valid: {data.valid}\n"
+                self._log_queue.append(info)
+    
+    def drain_log(self):
+        # Runs on the Tk thread every 100 ms: one insert for everything queued since the last pass
+        lines = []
+        while self._log_queue:
+            lines.append(self._log_queue.popleft())
+        if lines:
+            self.realtime_text.insert('end', ''.join(lines))
+            self.realtime_text.see('end')
+        
+        if self.running:
+            self._drain_job = self.root.after(100, self.drain_log)
+        else:
+            self._drain_job = None
+    
+    def chart_x_values(self):
+        # Matplotlib date numbers when timestamps exist, otherwise the row index
+        if 'timestamp' in self.current_data.columns:
+            timestamps = pd.to_datetime(self.current_data['timestamp'], unit='s')
+            locator = mdates.AutoDateLocator()
+            self.ax.xaxis.set_major_locator(locator)
+            self.ax.xaxis.set_major_formatter(mdates.AutoDateFormatter(locator))
+            self.ax.set_xlabel('Time')
+            return mdates.date2num(timestamps.to_numpy())
+        
+        self.ax.xaxis.set_major_locator(mticker.AutoLocator())
+        self.ax.xaxis.set_major_formatter(mticker.ScalarFormatter())
+        self.ax.set_xlabel('Index')
+        return np.arange(len(self.current_data))
+    
+    def remove_volume_bars(self):
+        if self.volume_bars is not None:
+            self.volume_bars.remove()
+            self.volume_bars = None
+    
+    def redraw_chart(self, ylabel, title):
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view()
+        self.ax.set_ylabel(ylabel)
+        self.ax.set_title(title)
+        self.canvas.draw_idle()
     
     def plot_price(self):
         if self.current_data is None or 'price' not in self.current_data.columns:
             messagebox.showwarning("Warning", "No price data available")
             return
         
-        self.ax.clear()
-        if 'timestamp' in self.current_data.columns:
-            timestamps = pd.to_datetime(self.current_data['timestamp'], unit='s')
-            self.ax.plot(timestamps, self.current_data['price'])
-            self.ax.set_xlabel('Time')
-        else:
-            self.ax.plot(self.current_data['price'])
-            self.ax.set_xlabel('Index')
-        
-        self.ax.set_ylabel('Price ($)')
-        self.ax.set_title('Price Chart')
-        self.ax.grid(True)
-        self.canvas.draw()
+        x = self.chart_x_values()
+        self.remove_volume_bars()
+        self.price_line.set_data(x, self.current_data['price'].to_numpy())
+        self.price_line.set_visible(True)
+        self.redraw_chart('Price ($)', 'Price Chart')
     
     def plot_volume(self):
         if self.current_data is None or 'volume' not in self.current_data.columns:
             messagebox.showwarning("Warning", "No volume data available")
             return
         
-        self.ax.clear()
-        if 'timestamp' in self.current_data.columns:
-            timestamps = pd.to_datetime(self.current_data['timestamp'], unit='s')
-            self.ax.bar(timestamps, self.current_data['volume'])
-            self.ax.set_xlabel('Time')
-        else:
-            self.ax.bar(range(len(self.current_data)), self.current_data['volume'])
-            self.ax.set_xlabel('Index')
-        
-        self.ax.set_ylabel('Volume')
-        self.ax.set_title('Volume Chart')
-        self.ax.grid(True)
-        self.canvas.draw()
+        x = self.chart_x_values()
+        self.remove_volume_bars()
+        self.price_line.set_visible(False)
+        self.volume_bars = self.ax.bar(x, self.current_data['volume'].to_numpy())
+        self.redraw_chart('Volume', 'Volume Chart')
     
     def clear_chart(self):
-        self.ax.clear()
-        self.canvas.draw()
+        self.remove_volume_bars()
+        self.price_line.set_data([], [])
+        self.price_line.set_visible(False)
+        self.ax.set_xlabel('')
+        self.ax.set_ylabel('')
+        self.ax.set_title('')
+        self.canvas.draw_idle()
     
     def on_closing(self):
         self.stop_monitoring()
         self.shared_memory.close()
+        if self.data_manager is not None:
+            self.data_manager.close()
         self.root.destroy()
 
 if __name__ == "__main__":
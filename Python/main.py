@@ -1,19 +1,90 @@
 #!/usr/bin/env python3
 """
 Simple Python consumer using consolidated data_bridge module
+
+Pass --rt to pin the consumer to one CPU and run it under SCHED_FIFO (needs
+CAP_SYS_NICE). For stable latency, reserve that core on the kernel command line,
+e.g. `isolcpus=3 nohz_full=3 rcu_nocbs=3` for the default --cpu 3.
 """
 
+import argparse
+import os
+import sys
+import time
+
 from data_bridge import TradingSystem
 
+def enable_realtime(cpu: int, priority: int) -> bool:
+    """Pin this process to `cpu` and switch it to SCHED_FIFO at `priority`"""
+    try:
+        os.sched_setaffinity(0, {cpu})
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        print(f"Realtime mode: CPU {cpu}, SCHED_FIFO priority {priority}")
+        return True
+    except (AttributeError, OSError) as e:
+        print(f"Could not enable realtime mode: {e}")
+        return False
+
+def follow(bridge, duration: float = None):
+    """Print every tick the producer publishes, for `duration` seconds or until interrupted.
+    
+    Each wakeup drains all pending ticks and writes them with one call, so the
+    consumer makes one stdout write per batch instead of one per tick.
+    """
+    # Locals avoid attribute lookups on every pass of the loop
+    write = sys.stdout.write
+    flush = sys.stdout.flush
+    wait_for_update = bridge.wait_for_update
+    read_batch = bridge.read_batch
+    monotonic_ns = time.monotonic_ns
+    deadline = None if duration is None else monotonic_ns() + int(duration * 1e9)
+    
+    while True:
+        if deadline is None:
+            timeout = 1.0
+        else:
+            remaining = deadline - monotonic_ns()
+            if remaining <= 0:
+                return
+            timeout = min(1.0, remaining / 1e9)
+        
+        if not wait_for_update(timeout):
+            continue
+        ticks = read_batch()
+        if ticks:
+            write(''.join(f"{tick.formatted_time}  Price=${tick.price:.2f}  Volume={tick.volume}\n"
+                          for tick in ticks))
+            flush()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Read the latest tick from C++ shared memory")
+    parser.add_argument('--follow', action='store_true', help="keep printing ticks as they are published")
+    parser.add_argument('--duration', type=float, help="with --follow, stop after this many seconds")
+    parser.add_argument('--rt', action='store_true',
+                        help="pin to --cpu and use SCHED_FIFO scheduling (requires CAP_SYS_NICE)")
+    parser.add_argument('--cpu', type=int, default=3, help="CPU to pin to with --rt (default: 3)")
+    parser.add_argument('--priority', type=int, default=50,
+                        help="SCHED_FIFO priority with --rt, 1-99 (default: 50)")
+    return parser.parse_args()
+
 def main():
     """Simple consumer example"""
+    args = parse_args()
+    if args.rt:
+        # Before connecting, so the mapping is faulted in on the pinned CPU
+        enable_realtime(args.cpu, args.priority)
+    
     system = TradingSystem()
     
     print("Starting simple monitoring...")
     try:
+        bridge = system.data_manager.bridge
+        if args.follow and bridge.connected:
+            follow(bridge, args.duration)
+        
         data = system.data_manager.get_shared_memory_data()
         if data:
-            print(f"Current data: Price=${data['price']:.2f}, Volume={data['volume']}, Valid={data['valid']}")
+            print(f"Current data: Price=${data.price:.2f}, Volume={data.volume}, Valid={data.valid}")
         else:
             print("No data available in shared memory")
             print("Make sure the C++ producer is running!")
@@ -21,4 +92,4 @@ def main():
         print("\nShutdown requested")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()